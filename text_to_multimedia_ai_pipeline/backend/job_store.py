@@ -0,0 +1,243 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+# --- Job statuses ---
+JOB_STATUS_QUEUED = "queued"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_SUCCEEDED = "succeeded"
+JOB_STATUS_FAILED = "failed"
+ACTIVE_JOB_STATUSES = (JOB_STATUS_QUEUED, JOB_STATUS_RUNNING)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    idempotency_key TEXT UNIQUE,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    artifact_paths TEXT,
+    error TEXT,
+    error_code INTEGER,
+    worker_id TEXT,
+    lease_expires_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_idx ON jobs (status);
+"""
+
+
+def extract_artifact_paths(result):
+    # Every endpoint reports its outputs as "<something>_path" keys (image_path, audio_path, ...).
+    return [value for key, value in result.items() if key.endswith("_path") and isinstance(value, str)]
+
+
+class JobStore:
+    """Durable job table backed by SQLite in WAL mode.
+
+    A single connection is shared across threads and serialised with a lock; every
+    state change is its own short autocommit transaction, so WAL with
+    synchronous=NORMAL keeps updates cheap while surviving process crashes.
+
+    Every running job is owned by one process (an API process running it inline, or a
+    worker) under a time-limited lease that the owner keeps alive with heartbeats. Jobs
+    whose lease runs out are taken over by another process; the same database doubles
+    as the work queue that worker processes claim queued jobs from.
+
+    Only processes on the same host may open the database: WAL relies on shared memory
+    that network filesystems (NFS, SMB) do not provide. Workers on other hosts reach the
+    queue through the API's /worker endpoints instead.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        journal_mode = self._conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        if journal_mode.lower() != "wal":
+            self._conn.close()
+            raise RuntimeError(f"Job database {db_path} cannot use WAL mode (got '{journal_mode}'); keep it on a local disk.")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _row_to_job(self, row):
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["artifact_paths"] = json.loads(job["artifact_paths"]) if job["artifact_paths"] else []
+        if job["started_at"] is not None and job["finished_at"] is not None:
+            job["duration_seconds"] = job["finished_at"] - job["started_at"]
+        else:
+            job["duration_seconds"] = None
+        return job
+
+    def _fetch_one(self, query, params):
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+        return self._row_to_job(row)
+
+    def get_job(self, job_id):
+        return self._fetch_one("SELECT * FROM jobs WHERE id = ?", (job_id,))
+
+    def get_job_by_idempotency_key(self, idempotency_key):
+        return self._fetch_one("SELECT * FROM jobs WHERE idempotency_key = ?", (idempotency_key,))
+
+    def create_job(self, kind, payload, idempotency_key=None, worker_id=None, lease_seconds=None):
+        """Insert a new job; returns (job, created).
+
+        With worker_id the job starts out running, owned by that process under a lease of
+        lease_seconds; without it the job is queued for a worker to claim.
+        If idempotency_key is already taken the existing job is returned with created=False,
+        which makes concurrent retries of the same request race-free.
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        if worker_id is not None:
+            status, attempts, started_at, lease_expires_at = JOB_STATUS_RUNNING, 1, now, now + lease_seconds
+        else:
+            status, attempts, started_at, lease_expires_at = JOB_STATUS_QUEUED, 0, None, None
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (id, kind, idempotency_key, payload, status, worker_id, lease_expires_at, "
+                "attempts, created_at, started_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, idempotency_key, json.dumps(payload, sort_keys=True), status,
+                 worker_id, lease_expires_at, attempts, now, started_at, now),
+            )
+            created = cursor.rowcount == 1
+        if created:
+            return self.get_job(job_id), True
+        return self.get_job_by_idempotency_key(idempotency_key), False
+
+    def _update(self, job_id, owner=None, **fields):
+        # When owner is given the update only applies while that worker still holds the running job,
+        # so a worker whose lease expired cannot overwrite the result of the worker that took over.
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        query = f"UPDATE jobs SET {assignments} WHERE id = ?"
+        params = [*fields.values(), job_id]
+        if owner is not None:
+            query += " AND worker_id = ? AND status = ?"
+            params.extend([owner, JOB_STATUS_RUNNING])
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+        return cursor.rowcount == 1
+
+    def mark_running(self, job_id, worker_id, lease_seconds, from_statuses=(JOB_STATUS_QUEUED,)):
+        """Claim a specific job for worker_id by moving it to running. Returns False if it was not in one of from_statuses."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, worker_id = ?, lease_expires_at = ?, attempts = attempts + 1, error = NULL, "
+                f"error_code = NULL, started_at = ?, finished_at = NULL, updated_at = ? WHERE id = ? AND status IN ({', '.join('?' for _ in from_statuses)})",
+                [JOB_STATUS_RUNNING, worker_id, now + lease_seconds, now, now, job_id, *from_statuses],
+            )
+        return cursor.rowcount == 1
+
+    def requeue(self, job_id, from_statuses=(JOB_STATUS_FAILED,)):
+        """Put a job back on the queue for a worker to pick up. Returns False if it was not in one of from_statuses."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, error = NULL, error_code = NULL, worker_id = NULL, lease_expires_at = NULL, "
+                f"finished_at = NULL, updated_at = ? WHERE id = ? AND status IN ({', '.join('?' for _ in from_statuses)})",
+                [JOB_STATUS_QUEUED, time.time(), job_id, *from_statuses],
+            )
+        return cursor.rowcount == 1
+
+    def claim_next_job(self, worker_id, lease_seconds, max_attempts, kinds=None, include_queued=True):
+        """Atomically claim the oldest queued job (or a running job whose lease expired) for worker_id.
+
+        Expired jobs that have already used up max_attempts are marked failed instead.
+        With include_queued=False only expired jobs are taken over, which is how an inline-mode
+        API recovers jobs from crashed processes without picking up work meant for workers.
+        Returns the claimed job, or None when there is nothing to do.
+        """
+        queued_status = JOB_STATUS_QUEUED if include_queued else None
+        kind_filter = ""
+        kind_params = []
+        if kinds:
+            kind_filter = f" AND kind IN ({', '.join('?' for _ in kinds)})"
+            kind_params = list(kinds)
+        with self._lock:
+            # BEGIN IMMEDIATE takes the database write lock up front, so two workers can never
+            # select the same row before one of them has marked it as claimed.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    now = time.time()
+                    row = self._conn.execute(
+                        "SELECT * FROM jobs WHERE (status = ? OR (status = ? AND lease_expires_at < ?))"
+                        f"{kind_filter} ORDER BY created_at LIMIT 1",
+                        [queued_status, JOB_STATUS_RUNNING, now, *kind_params],
+                    ).fetchone()
+                    if row is None:
+                        job_id = None
+                        break
+                    if row["status"] == JOB_STATUS_RUNNING and row["attempts"] >= max_attempts:
+                        self._conn.execute(
+                            "UPDATE jobs SET status = ?, error = ?, lease_expires_at = NULL, finished_at = ?, updated_at = ? WHERE id = ?",
+                            (JOB_STATUS_FAILED, f"'{row['worker_id']}' stopped heartbeating after {row['attempts']} attempt(s)",
+                             now, now, row["id"]),
+                        )
+                        continue
+                    job_id = row["id"]
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, worker_id = ?, lease_expires_at = ?, attempts = attempts + 1, "
+                        "error = NULL, error_code = NULL, started_at = ?, finished_at = NULL, updated_at = ? WHERE id = ?",
+                        (JOB_STATUS_RUNNING, worker_id, now + lease_seconds, now, now, job_id),
+                    )
+                    break
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get_job(job_id) if job_id else None
+
+    def heartbeat(self, job_id, worker_id, lease_seconds):
+        """Extend worker_id's lease on a running job. Returns False if the worker no longer owns it."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires_at = ?, updated_at = ? WHERE id = ? AND worker_id = ? AND status = ?",
+                (now + lease_seconds, now, job_id, worker_id, JOB_STATUS_RUNNING),
+            )
+        return cursor.rowcount == 1
+
+    def mark_succeeded(self, job_id, result, worker_id=None):
+        return self._update(
+            job_id,
+            owner=worker_id,
+            status=JOB_STATUS_SUCCEEDED,
+            result=json.dumps(result),
+            artifact_paths=json.dumps(extract_artifact_paths(result)),
+            lease_expires_at=None,
+            finished_at=time.time(),
+        )
+
+    def mark_failed(self, job_id, error, error_code=None, worker_id=None):
+        return self._update(
+            job_id,
+            owner=worker_id,
+            status=JOB_STATUS_FAILED,
+            error=str(error),
+            error_code=error_code,
+            lease_expires_at=None,
+            finished_at=time.time(),
+        )
@@ -1,46 +1,280 @@
-from fastapi import FastAPI, HTTPException
+import time
+_BACKEND_IMPORT_STARTED = time.perf_counter() # For reporting cold start time
+
+from fastapi import FastAPI, HTTPException, Header, Depends, Response
+from fastapi.concurrency import run_in_threadpool # So concurrent inline jobs do not block each other
 from pydantic import BaseModel
+from typing import Optional
 import os
-from PIL import Image # For dummy image
+import socket # For naming this API process as the owner of the jobs it runs
+import uuid
+import asyncio # For waiting on queued jobs without blocking the event loop
+import threading # For job heartbeats and resuming interrupted jobs without blocking requests
 import io
 from fastapi.responses import FileResponse # Required for returning files
-import cv2 # For OpenCV
+from fastapi.responses import JSONResponse # For 202 Accepted responses of queued jobs
 import shutil # For file operations
 import wave # For placeholder speech/music/sfx audio
 
+try:
+    from .job_store import JobStore, JOB_STATUS_RUNNING, JOB_STATUS_SUCCEEDED, JOB_STATUS_FAILED, ACTIVE_JOB_STATUSES
+    from .model_registry import ModelRegistry
+except ImportError: # Running as a top-level module (e.g. `uvicorn main:app` from backend/)
+    from job_store import JobStore, JOB_STATUS_RUNNING, JOB_STATUS_SUCCEEDED, JOB_STATUS_FAILED, ACTIVE_JOB_STATUSES
+    from model_registry import ModelRegistry
+
 app = FastAPI()
 
 # --- Project Root Path (for resolving relative paths from client) ---
-PROJECT_ROOT_DIR = "/app/text_to_multimedia_ai_pipeline"
+# Generated files are written below it; override with PIPELINE_PROJECT_ROOT (e.g. for workers or tests).
+PROJECT_ROOT_DIR = os.environ.get("PIPELINE_PROJECT_ROOT", "/app/text_to_multimedia_ai_pipeline")
 
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
 
+# --- Lazy Model & Codec Registry ---
+# Heavy modules (OpenCV, Pillow) and, later, the generation models are loaded on first use,
+# so a node only pays for what it actually serves. PIPELINE_WARMUP lists names to load at
+# startup instead (e.g. "cv2,PIL.Image"). Models are unloaded LRU-first when the memory budget
+# is exceeded, and after MODEL_IDLE_UNLOAD_SECONDS without use (0 disables idle unloading).
+MODEL_MEMORY_BUDGET_MB = int(os.environ.get("PIPELINE_MODEL_MEMORY_BUDGET_MB", "8192")) # Half of a 16GB M2
+MODEL_IDLE_UNLOAD_SECONDS = int(os.environ.get("PIPELINE_MODEL_IDLE_UNLOAD_SECONDS", "600"))
+MODEL_WARMUP = [name.strip() for name in os.environ.get("PIPELINE_WARMUP", "").split(",") if name.strip()]
+model_registry = ModelRegistry(memory_budget_bytes=MODEL_MEMORY_BUDGET_MB * 2**20)
+model_registry.register_module("cv2") # For placeholder video generation
+model_registry.register_module("PIL.Image") # For placeholder image generation
+# Real models register here with a loader and their footprint, e.g.:
+# model_registry.register("sdxl-turbo", load_sdxl_turbo, size_bytes=7 * 2**30)
+startup_timings = {}
+
+def warm_up_models() -> dict:
+    timings = model_registry.warm_up(MODEL_WARMUP)
+    if timings:
+        print("Warm-up: " + ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in timings.items()))
+    return timings
+
+@app.get("/models")
+async def get_models():
+    return {"startup": startup_timings, "models": model_registry.stats()}
+
+# --- Durable Job Store ---
+# Every generation request is recorded as a job (payload, status, artifact paths, timings).
+# Clients may send an `Idempotency-Key` header so that a retried POST returns the original
+# result instead of redoing the work.
+#
+# Execution modes (PIPELINE_EXECUTION_MODE):
+#   inline - this process runs the job itself, in its threadpool, while handling the request (default).
+#   queue  - this process only enqueues jobs; `backend/worker.py` processes claim and run them.
+#            Requests wait up to JOB_WAIT_TIMEOUT_SECONDS for the result, or return 202 with the
+#            job id straight away when sent with `Prefer: respond-async`.
+# Whichever process runs a job owns it under a JOB_LEASE_SECONDS lease that it renews with
+# heartbeats; a job whose lease expires (its owner crashed) is taken over and run again.
+# The job database must stay on a local disk of the API host. Workers on the same host may open it
+# directly (PIPELINE_JOB_DB); workers on other hosts use the /worker endpoints below (--api-url).
+JOB_STORE_DB_PATH = os.environ.get("PIPELINE_JOB_DB", os.path.join(PROJECT_ROOT_DIR, "data/jobs.db"))
+JOB_EXECUTION_MODE = os.environ.get("PIPELINE_EXECUTION_MODE", "inline")
+JOB_MAX_ATTEMPTS = 2 # Interrupted jobs are resumed (inline) or re-claimed (queue) until attempted this many times
+JOB_LEASE_SECONDS = 30
+JOB_RECOVERY_INTERVAL_SECONDS = JOB_LEASE_SECONDS
+API_PROCESS_ID = f"api-{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+JOB_WAIT_TIMEOUT_SECONDS = 300
+JOB_WAIT_POLL_INTERVAL_SECONDS = 0.1
+_job_store = None
+_job_store_lock = threading.Lock()
+
+def get_job_store() -> JobStore:
+    # Opened on first use rather than at import, so importing this module (e.g. a worker that talks
+    # to the API over HTTP) neither creates data/ nor opens and migrates the database.
+    global _job_store
+    with _job_store_lock:
+        if _job_store is None:
+            _job_store = JobStore(JOB_STORE_DB_PATH)
+        return _job_store
+
+class JobOptions(BaseModel):
+    idempotency_key: Optional[str] = None
+    respond_async: bool = False
+
+def job_options(idempotency_key: Optional[str] = Header(None), prefer: Optional[str] = Header(None)) -> JobOptions:
+    return JobOptions(idempotency_key=idempotency_key, respond_async="respond-async" in (prefer or ""))
+
+def heartbeat_loop(store, job_id: str, worker_id: str, lease_seconds: float, stop_event: threading.Event):
+    # Renew well before the lease runs out so a slow heartbeat never lets another process take over the job.
+    while not stop_event.wait(lease_seconds / 3):
+        if not store.heartbeat(job_id, worker_id, lease_seconds):
+            print(f"[{worker_id}] Lost the lease on job {job_id}; its result will be discarded.")
+            return
+
+def execute_job(job_id: str, kind: str, attempt: int, request_model: BaseModel, worker_id: str, lease_seconds: float = JOB_LEASE_SECONDS, store=None) -> dict:
+    """Run a job that worker_id has claimed, keeping its lease alive until the outcome is recorded.
+
+    store defaults to the local job store; remote workers pass a client for the /worker endpoints.
+    """
+    store = store or get_job_store()
+    handler = JOB_HANDLERS[kind][1]
+    stop_heartbeat = threading.Event()
+    heartbeat_thread = threading.Thread(target=heartbeat_loop, args=(store, job_id, worker_id, lease_seconds, stop_heartbeat), daemon=True)
+    heartbeat_thread.start()
+    try:
+        try:
+            result = handler(request_model, job_id, attempt)
+        except HTTPException as e:
+            store.mark_failed(job_id, e.detail, error_code=e.status_code, worker_id=worker_id)
+            raise
+        except Exception as e:
+            store.mark_failed(job_id, e, error_code=500, worker_id=worker_id)
+            raise
+        result = {**result, "job_id": job_id}
+        if not store.mark_succeeded(job_id, result, worker_id=worker_id):
+            # Another process took the job over; its attempt's result is the one recorded (and replayed
+            # for the Idempotency-Key), so this attempt's artifact paths must not reach the client.
+            raise HTTPException(status_code=409, detail=f"Lost the lease on job {job_id} to another process; see /jobs/{job_id} for its result.")
+        return result
+    finally:
+        stop_heartbeat.set()
+        heartbeat_thread.join()
+
+def job_accepted_response(job: dict) -> JSONResponse:
+    return JSONResponse(status_code=202, content={
+        "message": "Job accepted",
+        "job_id": job["id"],
+        "status": job["status"],
+        "status_url": f"/jobs/{job['id']}"
+    })
+
+async def wait_for_job(job: dict):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + JOB_WAIT_TIMEOUT_SECONDS
+    while job["status"] in ACTIVE_JOB_STATUSES:
+        if loop.time() >= deadline:
+            return job_accepted_response(job)
+        await asyncio.sleep(JOB_WAIT_POLL_INTERVAL_SECONDS)
+        job = await run_in_threadpool(get_job_store().get_job, job["id"])
+    if job["status"] == JOB_STATUS_FAILED:
+        raise HTTPException(status_code=job["error_code"] or 500, detail=job["error"])
+    return job["result"]
+
+async def run_job(kind: str, request_model: BaseModel, options: JobOptions):
+    payload = request_model.model_dump()
+    queue_mode = JOB_EXECUTION_MODE == "queue"
+    # Inline jobs start out running, owned by this process; queued jobs wait for a worker to claim them.
+    owner = None if queue_mode else API_PROCESS_ID
+    # Store calls run in the threadpool: they may wait on the SQLite write lock held by another process.
+    job, owns_job = await run_in_threadpool(get_job_store().create_job, kind, payload, options.idempotency_key, owner, JOB_LEASE_SECONDS)
+    if not owns_job:
+        if job["kind"] != kind or job["payload"] != payload:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request.")
+        if job["status"] == JOB_STATUS_SUCCEEDED:
+            print(f"Replaying stored result of job {job['id']} for Idempotency-Key '{options.idempotency_key}'")
+            return job["result"]
+        if job["status"] == JOB_STATUS_FAILED:
+            if queue_mode:
+                owns_job = await run_in_threadpool(get_job_store().requeue, job["id"])
+            else:
+                owns_job = await run_in_threadpool(get_job_store().mark_running, job["id"], API_PROCESS_ID, JOB_LEASE_SECONDS, (JOB_STATUS_FAILED,))
+            if owns_job:
+                print(f"Retrying failed job {job['id']} for Idempotency-Key '{options.idempotency_key}'")
+            job = await run_in_threadpool(get_job_store().get_job, job["id"])
+    if queue_mode:
+        # Whoever enqueued the job, a worker runs it; duplicate requests simply wait for the same job.
+        if options.respond_async:
+            return job_accepted_response(job)
+        return await wait_for_job(job)
+    if not owns_job:
+        raise HTTPException(status_code=409, detail=f"Job {job['id']} for this Idempotency-Key is still in progress.")
+    return await run_in_threadpool(execute_job, job["id"], kind, job["attempts"], request_model, API_PROCESS_ID)
+
+def job_output_paths(output_dir_client: str, job_id: str, attempt: int, filename: str):
+    # Each attempt of a job writes into its own subdirectory, so processes running jobs concurrently
+    # never overwrite each other's output files, and a stale worker that lost its lease cannot
+    # overwrite the artifact of the attempt that took over (whose result is the one recorded).
+    output_path_client = os.path.join(output_dir_client, job_id, str(attempt), filename)
+    output_path_server = os.path.join(PROJECT_ROOT_DIR, output_path_client)
+    os.makedirs(os.path.dirname(output_path_server), exist_ok=True)
+    return output_path_server, output_path_client
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await run_in_threadpool(get_job_store().get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+# --- Worker API ---
+# Lets workers on other hosts claim, heartbeat and complete jobs without opening the SQLite
+# database over the network (`python -m backend.worker --api-url http://api-host:8000`).
+# Lease fencing is the same as for local workers: a worker that lost its lease gets 409.
+class WorkerClaimRequest(BaseModel):
+    worker_id: str
+    lease_seconds: float = JOB_LEASE_SECONDS
+    kinds: Optional[list[str]] = None
+
+class WorkerHeartbeatRequest(BaseModel):
+    worker_id: str
+    lease_seconds: float = JOB_LEASE_SECONDS
+
+class WorkerCompleteRequest(BaseModel):
+    worker_id: str
+    result: dict
+
+class WorkerFailRequest(BaseModel):
+    worker_id: str
+    error: str
+    error_code: Optional[int] = None
+
+def lease_lost(job_id: str, worker_id: str) -> HTTPException:
+    return HTTPException(status_code=409, detail=f"Worker '{worker_id}' no longer holds the lease on job {job_id}.")
+
+@app.post("/worker/claim")
+async def worker_claim(request: WorkerClaimRequest):
+    job = await run_in_threadpool(get_job_store().claim_next_job, request.worker_id, request.lease_seconds, JOB_MAX_ATTEMPTS, request.kinds)
+    if job is None:
+        return Response(status_code=204)
+    return job
+
+@app.post("/worker/jobs/{job_id}/heartbeat")
+async def worker_heartbeat(job_id: str, request: WorkerHeartbeatRequest):
+    if not await run_in_threadpool(get_job_store().heartbeat, job_id, request.worker_id, request.lease_seconds):
+        raise lease_lost(job_id, request.worker_id)
+    return {"job_id": job_id, "status": JOB_STATUS_RUNNING}
+
+@app.post("/worker/jobs/{job_id}/complete")
+async def worker_complete(job_id: str, request: WorkerCompleteRequest):
+    if not await run_in_threadpool(get_job_store().mark_succeeded, job_id, request.result, request.worker_id):
+        raise lease_lost(job_id, request.worker_id)
+    return {"job_id": job_id, "status": JOB_STATUS_SUCCEEDED}
+
+@app.post("/worker/jobs/{job_id}/fail")
+async def worker_fail(job_id: str, request: WorkerFailRequest):
+    if not await run_in_threadpool(get_job_store().mark_failed, job_id, request.error, request.error_code, request.worker_id):
+        raise lease_lost(job_id, request.worker_id)
+    return {"job_id": job_id, "status": JOB_STATUS_FAILED}
+
 class ImagePrompt(BaseModel):
     prompt: str
 
-GENERATED_IMAGES_DIR_SERVER = os.path.join(PROJECT_ROOT_DIR, "data/generated_images")
-os.makedirs(GENERATED_IMAGES_DIR_SERVER, exist_ok=True)
-
 @app.post("/generate-image")
-async def generate_image(prompt_data: ImagePrompt):
+async def generate_image(prompt_data: ImagePrompt, options: JobOptions = Depends(job_options)):
+    return await run_job("generate-image", prompt_data, options)
+
+def generate_image_job(prompt_data: ImagePrompt, job_id: str, attempt: int) -> dict:
     prompt = prompt_data.prompt
     print(f"Received prompt: {prompt}")
     try:
+        Image = model_registry.get("PIL.Image")
         img = Image.new('RGB', (512, 512), color = 'blue')
         img_byte_arr = io.BytesIO()
         img.save(img_byte_arr, format='PNG')
         img_byte_arr.seek(0)
         image_filename = "placeholder_image.png"
-        image_path_on_server = os.path.join(GENERATED_IMAGES_DIR_SERVER, image_filename)
+        image_path_on_server, client_accessible_image_path = job_output_paths("data/generated_images", job_id, attempt, image_filename)
         with open(image_path_on_server, "wb") as f:
             f.write(img_byte_arr.getvalue())
         print(f"Placeholder image saved to {image_path_on_server}")
         print("Placeholder: Upscaling would be applied here (e.g., with Real-ESRGAN) if an upscaler was integrated.")
         upscaling_status_message = "pending_integration"
         base_resolution = "512x512"
-        client_accessible_image_path = os.path.join("data/generated_images", image_filename)
         return {
             "message": "Image generated successfully (placeholder)",
             "image_path": client_accessible_image_path,
@@ -55,19 +289,20 @@ class VideoRequest(BaseModel):
     image_path: str
     motion_type: str
 
-GENERATED_VIDEOS_DIR_SERVER = os.path.join(PROJECT_ROOT_DIR, "data/generated_videos")
-os.makedirs(GENERATED_VIDEOS_DIR_SERVER, exist_ok=True)
-
 @app.post("/generate-video")
-async def generate_video(request: VideoRequest):
+async def generate_video(request: VideoRequest, options: JobOptions = Depends(job_options)):
+    return await run_job("generate-video", request, options)
+
+def generate_video_job(request: VideoRequest, job_id: str, attempt: int) -> dict:
     print(f"Received video request: image_path='{request.image_path}', motion_type='{request.motion_type}'")
     actual_image_path_on_server = os.path.join(PROJECT_ROOT_DIR, request.image_path)
     if not os.path.exists(actual_image_path_on_server):
         print(f"Error: Input image not found at {actual_image_path_on_server}")
         raise HTTPException(status_code=404, detail=f"Input image not found: {request.image_path}")
     output_video_filename = "placeholder_video.mp4"
-    output_video_path_on_server = os.path.join(GENERATED_VIDEOS_DIR_SERVER, output_video_filename)
+    output_video_path_on_server, client_accessible_video_path = job_output_paths("data/generated_videos", job_id, attempt, output_video_filename)
     try:
+        cv2 = model_registry.get("cv2")
         img_cv = cv2.imread(actual_image_path_on_server)
         if img_cv is None:
             print(f"Error: cv2.imread failed to load image from {actual_image_path_on_server}")
@@ -91,7 +326,6 @@ async def generate_video(request: VideoRequest):
     except Exception as e:
         print(f"Error generating placeholder video with OpenCV: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to create placeholder video: {str(e)}")
-    client_accessible_video_path = os.path.join("data/generated_videos", output_video_filename)
     return {
         "message": "Video generated successfully (placeholder)",
         "video_path": client_accessible_video_path,
@@ -107,15 +341,14 @@ class TTSRequest(BaseModel):
     voice: str
     emotion: str
 
-GENERATED_AUDIO_SPEECH_DIR_SERVER = os.path.join(PROJECT_ROOT_DIR, "data/generated_audio/speech")
-os.makedirs(GENERATED_AUDIO_SPEECH_DIR_SERVER, exist_ok=True)
-
 @app.post("/generate-speech")
-async def generate_speech(request: TTSRequest):
+async def generate_speech(request: TTSRequest, options: JobOptions = Depends(job_options)):
+    return await run_job("generate-speech", request, options)
+
+def generate_speech_job(request: TTSRequest, job_id: str, attempt: int) -> dict:
     print(f"Received speech request: text='{request.text[:50]}...', voice='{request.voice}', emotion='{request.emotion}'")
     output_filename = "placeholder_speech.wav"
-    output_path_server = os.path.join(GENERATED_AUDIO_SPEECH_DIR_SERVER, output_filename)
-    output_path_client = os.path.join("data/generated_audio/speech", output_filename)
+    output_path_server, output_path_client = job_output_paths("data/generated_audio/speech", job_id, attempt, output_filename)
     try:
         with wave.open(output_path_server, 'wb') as wf:
             wf.setnchannels(1)
@@ -140,15 +373,14 @@ class MusicRequest(BaseModel):
     style: str
     duration_seconds: int
 
-GENERATED_AUDIO_MUSIC_DIR_SERVER = os.path.join(PROJECT_ROOT_DIR, "data/generated_audio/music")
-os.makedirs(GENERATED_AUDIO_MUSIC_DIR_SERVER, exist_ok=True)
-
 @app.post("/generate-music")
-async def generate_music(request: MusicRequest):
+async def generate_music(request: MusicRequest, options: JobOptions = Depends(job_options)):
+    return await run_job("generate-music", request, options)
+
+def generate_music_job(request: MusicRequest, job_id: str, attempt: int) -> dict:
     print(f"Received music request: style='{request.style}', duration='{request.duration_seconds}s'")
     output_filename = "placeholder_music.wav"
-    output_path_server = os.path.join(GENERATED_AUDIO_MUSIC_DIR_SERVER, output_filename)
-    output_path_client = os.path.join("data/generated_audio/music", output_filename)
+    output_path_server, output_path_client = job_output_paths("data/generated_audio/music", job_id, attempt, output_filename)
     duration = max(1, request.duration_seconds)
     try:
         with wave.open(output_path_server, 'wb') as wf:
@@ -174,15 +406,14 @@ class SFXRequest(BaseModel):
     category: str
     description: str
 
-GENERATED_AUDIO_SFX_DIR_SERVER = os.path.join(PROJECT_ROOT_DIR, "data/generated_audio/sfx")
-os.makedirs(GENERATED_AUDIO_SFX_DIR_SERVER, exist_ok=True)
-
 @app.post("/generate-sfx")
-async def generate_sfx(request: SFXRequest):
+async def generate_sfx(request: SFXRequest, options: JobOptions = Depends(job_options)):
+    return await run_job("generate-sfx", request, options)
+
+def generate_sfx_job(request: SFXRequest, job_id: str, attempt: int) -> dict:
     print(f"Received SFX request: category='{request.category}', description='{request.description[:50]}...'")
     output_filename = "placeholder_sfx.wav"
-    output_path_server = os.path.join(GENERATED_AUDIO_SFX_DIR_SERVER, output_filename)
-    output_path_client = os.path.join("data/generated_audio/sfx", output_filename)
+    output_path_server, output_path_client = job_output_paths("data/generated_audio/sfx", job_id, attempt, output_filename)
     sfx_duration = 0.5
     try:
         with wave.open(output_path_server, 'wb') as wf:
@@ -209,11 +440,11 @@ class LipSyncRequest(BaseModel):
     video_path: str
     audio_path: str
 
-GENERATED_VIDEOS_LIPSYNCED_DIR_SERVER = os.path.join(PROJECT_ROOT_DIR, "data/generated_videos/lipsynced")
-os.makedirs(GENERATED_VIDEOS_LIPSYNCED_DIR_SERVER, exist_ok=True)
-
 @app.post("/sync-lips")
-async def sync_lips(request: LipSyncRequest):
+async def sync_lips(request: LipSyncRequest, options: JobOptions = Depends(job_options)):
+    return await run_job("sync-lips", request, options)
+
+def sync_lips_job(request: LipSyncRequest, job_id: str, attempt: int) -> dict:
     print(f"Received lip sync request for video: '{request.video_path}' and audio: '{request.audio_path}'")
     actual_video_path_server = os.path.join(PROJECT_ROOT_DIR, request.video_path)
     actual_audio_path_server = os.path.join(PROJECT_ROOT_DIR, request.audio_path)
@@ -225,8 +456,7 @@ async def sync_lips(request: LipSyncRequest):
         base_video_name = os.path.basename(request.video_path)
         name_part, ext_part = os.path.splitext(base_video_name)
         output_filename = f"{name_part}_lipsynced{ext_part}"
-        output_path_server = os.path.join(GENERATED_VIDEOS_LIPSYNCED_DIR_SERVER, output_filename)
-        output_path_client = os.path.join("data/generated_videos/lipsynced", output_filename)
+        output_path_server, output_path_client = job_output_paths("data/generated_videos/lipsynced", job_id, attempt, output_filename)
         shutil.copy(actual_video_path_server, output_path_server)
         print(f"Placeholder lip-synced video (copied) saved to {output_path_server}")
     except Exception as e:
@@ -237,6 +467,72 @@ async def sync_lips(request: LipSyncRequest):
         "lipsynced_video_path": output_path_client
     }
 
+# --- Job Handlers (used for direct requests and for resuming interrupted jobs) ---
+JOB_HANDLERS = {
+    "generate-image": (ImagePrompt, generate_image_job),
+    "generate-video": (VideoRequest, generate_video_job),
+    "generate-speech": (TTSRequest, generate_speech_job),
+    "generate-music": (MusicRequest, generate_music_job),
+    "generate-sfx": (SFXRequest, generate_sfx_job),
+    "sync-lips": (LipSyncRequest, sync_lips_job),
+}
+
+def resume_interrupted_jobs():
+    # Take over running jobs whose owner stopped heartbeating (e.g. a crashed or restarted API
+    # process), one at a time so each is claimed only when it can be run and heartbeated right away.
+    # Jobs of live API processes keep their lease and queued jobs are left to the workers.
+    while True:
+        job = get_job_store().claim_next_job(API_PROCESS_ID, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, include_queued=False)
+        if job is None:
+            return
+        print(f"Resuming interrupted job {job['id']} ({job['kind']}, attempt {job['attempts']})")
+        try:
+            request_model = JOB_HANDLERS[job["kind"]][0](**job["payload"])
+        except Exception as e:
+            print(f"Cannot resume job {job['id']}: invalid payload: {e}")
+            get_job_store().mark_failed(job["id"], f"Invalid job payload: {e}", error_code=422, worker_id=API_PROCESS_ID)
+            continue
+        try:
+            execute_job(job["id"], job["kind"], job["attempts"], request_model, API_PROCESS_ID)
+        except Exception as e:
+            print(f"Resumed job {job['id']} failed again: {getattr(e, 'detail', e)}")
+
+def resume_interrupted_jobs_periodically():
+    while True:
+        try:
+            resume_interrupted_jobs()
+        except Exception as e:
+            # E.g. the database stayed locked past its busy timeout; keep recovering on the next round.
+            print(f"Job recovery failed: {e}")
+        time.sleep(JOB_RECOVERY_INTERVAL_SECONDS)
+
+async def unload_idle_models_periodically():
+    while True:
+        await asyncio.sleep(max(1, min(60, MODEL_IDLE_UNLOAD_SECONDS)))
+        model_registry.unload_idle(MODEL_IDLE_UNLOAD_SECONDS)
+
+@app.on_event("startup")
+async def warm_up():
+    warmup_started = time.perf_counter()
+    startup_timings["warmup_models"] = warm_up_models()
+    startup_timings["warmup_seconds"] = time.perf_counter() - warmup_started
+    print(f"Startup: backend import {startup_timings['import_seconds'] * 1000:.0f} ms, warm-up {startup_timings['warmup_seconds'] * 1000:.0f} ms")
+    if MODEL_IDLE_UNLOAD_SECONDS > 0:
+        asyncio.get_running_loop().create_task(unload_idle_models_periodically())
+
+@app.on_event("startup")
+async def open_job_store():
+    # Open (and migrate) the database before serving, instead of on the first request.
+    await run_in_threadpool(get_job_store)
+
+@app.on_event("startup")
+async def recover_jobs():
+    if JOB_EXECUTION_MODE == "queue":
+        return # Workers re-claim jobs whose lease has expired
+    threading.Thread(target=resume_interrupted_jobs_periodically, daemon=True).start()
+
+startup_timings["import_seconds"] = time.perf_counter() - _BACKEND_IMPORT_STARTED
+
 # --- Conceptual Audio Synchronization and Final Assembly Notes ---
 # This section outlines how various audio tracks (speech, music, SFX) would be
 # combined with the video, typically after lip synchronization.
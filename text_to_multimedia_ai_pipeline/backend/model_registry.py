@@ -0,0 +1,144 @@
+import importlib
+import threading
+import time
+from contextlib import contextmanager
+
+
+class _Entry:
+    def __init__(self, name, loader, size_bytes, unloader, evictable):
+        self.name = name
+        self.loader = loader
+        self.size_bytes = size_bytes
+        self.unloader = unloader
+        self.evictable = evictable
+        self.value = None
+        self.loaded = False
+        self.load_seconds = None
+        self.last_used = None
+        self.in_use = 0
+        self.load_lock = threading.Lock()
+
+
+class ModelRegistry:
+    """Loads heavy modules and models on first use instead of at import time.
+
+    Models are registered with an estimated memory footprint. When loading one pushes the
+    total over memory_budget_bytes, the least recently used models that are not currently
+    in use are unloaded; unload_idle() additionally drops models nobody has used for a while.
+    Python modules can be registered too, so codecs like cv2 are only imported by the
+    nodes that need them, but they are never unloaded.
+    """
+
+    def __init__(self, memory_budget_bytes=None):
+        self.memory_budget_bytes = memory_budget_bytes
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader, size_bytes=0, unloader=None, evictable=True):
+        with self._lock:
+            self._entries[name] = _Entry(name, loader, size_bytes, unloader, evictable)
+
+    def register_module(self, module_name):
+        self.register(module_name, lambda: importlib.import_module(module_name), evictable=False)
+
+    def _entry(self, name):
+        try:
+            return self._entries[name]
+        except KeyError:
+            raise KeyError(f"No model or module registered under '{name}'") from None
+
+    def _load(self, entry):
+        with entry.load_lock:
+            with self._lock:
+                if entry.loaded:
+                    return entry.value
+            started = time.perf_counter()
+            value = entry.loader()
+            with self._lock:
+                # Publish under the lock and return our own reference: another thread may evict
+                # the entry (setting entry.value to None) as soon as the lock is released.
+                entry.value = value
+                entry.load_seconds = time.perf_counter() - started
+                entry.loaded = True
+                entry.last_used = time.monotonic()
+            print(f"Loaded '{entry.name}' in {entry.load_seconds * 1000:.0f} ms")
+            self._enforce_budget(keep=entry)
+        return value
+
+    def get(self, name):
+        entry = self._entry(name)
+        with self._lock:
+            entry.last_used = time.monotonic()
+            if entry.loaded:
+                return entry.value
+        return self._load(entry)
+
+    @contextmanager
+    def use(self, name):
+        """Like get(), but keeps the model from being unloaded until the block exits."""
+        entry = self._entry(name)
+        with self._lock:
+            entry.in_use += 1
+        try:
+            yield self.get(name)
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                entry.last_used = time.monotonic()
+
+    def warm_up(self, names):
+        """Load the given models/modules up front; returns {name: seconds spent loading}."""
+        timings = {}
+        for name in names:
+            started = time.perf_counter()
+            self.get(name)
+            timings[name] = time.perf_counter() - started
+        return timings
+
+    def _unload(self, entry):
+        # Caller holds self._lock.
+        if entry.unloader is not None:
+            entry.unloader(entry.value)
+        entry.value = None
+        entry.loaded = False
+        print(f"Unloaded '{entry.name}' (last used {time.monotonic() - entry.last_used:.0f}s ago)")
+
+    def _enforce_budget(self, keep):
+        if self.memory_budget_bytes is None:
+            return
+        with self._lock:
+            loaded = [e for e in self._entries.values() if e.loaded and e.evictable]
+            total = sum(e.size_bytes for e in loaded)
+            candidates = sorted((e for e in loaded if e is not keep and e.in_use == 0), key=lambda e: e.last_used)
+            for entry in candidates:
+                if total <= self.memory_budget_bytes:
+                    break
+                self._unload(entry)
+                total -= entry.size_bytes
+            if total > self.memory_budget_bytes:
+                print(f"Warning: loaded models use {total / 2**20:.0f} MB, over the {self.memory_budget_bytes / 2**20:.0f} MB budget")
+
+    def unload_idle(self, max_idle_seconds):
+        """Unload evictable models that have not been used for max_idle_seconds. Returns their names."""
+        now = time.monotonic()
+        unloaded = []
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.loaded and entry.evictable and entry.in_use == 0 and now - entry.last_used >= max_idle_seconds:
+                    self._unload(entry)
+                    unloaded.append(entry.name)
+        return unloaded
+
+    def stats(self):
+        with self._lock:
+            return [
+                {
+                    "name": entry.name,
+                    "loaded": entry.loaded,
+                    "load_seconds": entry.load_seconds,
+                    "size_bytes": entry.size_bytes,
+                    "evictable": entry.evictable,
+                    "in_use": entry.in_use,
+                }
+                for entry in self._entries.values()
+            ]
@@ -0,0 +1,129 @@
+import argparse
+import os
+import socket
+import time
+
+import requests
+
+try:
+    from .main import JOB_HANDLERS, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, MODEL_IDLE_UNLOAD_SECONDS, execute_job, get_job_store, model_registry, startup_timings, warm_up_models
+except ImportError: # Running as a script (e.g. `python worker.py` from backend/)
+    from main import JOB_HANDLERS, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, MODEL_IDLE_UNLOAD_SECONDS, execute_job, get_job_store, model_registry, startup_timings, warm_up_models
+
+# --- Worker Process ---
+# Claims jobs enqueued by an API running with PIPELINE_EXECUTION_MODE=queue and runs them with
+# the same handlers the API uses inline. Workers on the API host open the job database directly
+# (PIPELINE_JOB_DB); workers on other hosts must go through the API with --api-url, because the
+# SQLite database cannot be shared over a network filesystem. Generated files are written under
+# data/, so remote workers need that directory on storage the API host can read as well.
+#
+#   PIPELINE_EXECUTION_MODE=queue uvicorn backend.main:app
+#   python -m backend.worker --worker-id render-1
+#   python -m backend.worker --worker-id render-2 --kinds generate-video sync-lips --api-url http://api-host:8000
+
+DEFAULT_LEASE_SECONDS = JOB_LEASE_SECONDS
+DEFAULT_POLL_INTERVAL_SECONDS = 0.5
+
+class ApiJobQueue:
+    """The job store methods a worker needs, served by the API's /worker endpoints."""
+
+    def __init__(self, api_url: str, timeout: float = 10):
+        self.api_url = api_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _post(self, path: str, payload: dict) -> requests.Response:
+        return self.session.post(f"{self.api_url}{path}", json=payload, timeout=self.timeout)
+
+    def claim_next_job(self, worker_id, lease_seconds, max_attempts, kinds=None):
+        # max_attempts is enforced by the API with its own JOB_MAX_ATTEMPTS.
+        response = self._post("/worker/claim", {"worker_id": worker_id, "lease_seconds": lease_seconds, "kinds": kinds})
+        response.raise_for_status()
+        return None if response.status_code == 204 else response.json()
+
+    def heartbeat(self, job_id, worker_id, lease_seconds):
+        # Only 409 means the lease was lost. On network errors and other error statuses (e.g. the
+        # API restarting) keep the job; the next heartbeat retries and the lease still fences a late result.
+        try:
+            response = self._post(f"/worker/jobs/{job_id}/heartbeat", {"worker_id": worker_id, "lease_seconds": lease_seconds})
+        except requests.exceptions.RequestException as e:
+            print(f"[{worker_id}] Heartbeat for job {job_id} failed: {e}")
+            return True
+        if response.status_code == 409:
+            return False
+        if response.status_code != 200:
+            print(f"[{worker_id}] Heartbeat for job {job_id} failed: {response.status_code} - {response.text}")
+        return True
+
+    def _finish(self, job_id, action, payload):
+        response = self._post(f"/worker/jobs/{job_id}/{action}", payload)
+        if response.status_code == 409:
+            return False
+        response.raise_for_status()
+        return True
+
+    def mark_succeeded(self, job_id, result, worker_id=None):
+        return self._finish(job_id, "complete", {"worker_id": worker_id, "result": result})
+
+    def mark_failed(self, job_id, error, error_code=None, worker_id=None):
+        return self._finish(job_id, "fail", {"worker_id": worker_id, "error": str(error), "error_code": error_code})
+
+def process_job(queue, job: dict, worker_id: str, lease_seconds: float):
+    print(f"[{worker_id}] Claimed job {job['id']} ({job['kind']}, attempt {job['attempts']})")
+    try:
+        try:
+            request_model = JOB_HANDLERS[job["kind"]][0](**job["payload"])
+        except Exception as e:
+            queue.mark_failed(job["id"], f"Invalid job payload: {e}", error_code=422, worker_id=worker_id)
+            raise
+        execute_job(job["id"], job["kind"], job["attempts"], request_model, worker_id, lease_seconds, store=queue)
+        print(f"[{worker_id}] Finished job {job['id']}")
+    except Exception as e:
+        # Handler failures are recorded on the job by execute_job. If recording the outcome failed
+        # itself (e.g. the API was unreachable), nothing was recorded and the job is claimed again
+        # once its lease expires.
+        print(f"[{worker_id}] Job {job['id']} failed: {getattr(e, 'detail', e)}")
+
+def run_worker(worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS, poll_interval: float = DEFAULT_POLL_INTERVAL_SECONDS, kinds=None, exit_when_idle: bool = False, api_url: str = None) -> int:
+    unknown_kinds = set(kinds or []) - set(JOB_HANDLERS)
+    if unknown_kinds:
+        raise ValueError(f"Unknown job kinds: {', '.join(sorted(unknown_kinds))}")
+    queue = ApiJobQueue(api_url) if api_url else get_job_store()
+    queue_location = f"api: {api_url}" if api_url else f"db: {queue.db_path}"
+    warmup_started = time.perf_counter()
+    warm_up_models()
+    print(f"[{worker_id}] Worker started ({queue_location}, kinds: {', '.join(kinds) if kinds else 'all'}, "
+          f"import {startup_timings['import_seconds'] * 1000:.0f} ms, warm-up {(time.perf_counter() - warmup_started) * 1000:.0f} ms)")
+    processed = 0
+    while True:
+        try:
+            job = queue.claim_next_job(worker_id, lease_seconds, JOB_MAX_ATTEMPTS, kinds=kinds)
+        except requests.exceptions.RequestException as e:
+            # The API may be restarting or briefly unreachable; keep the worker alive and retry.
+            print(f"[{worker_id}] Could not claim a job: {e}")
+            time.sleep(poll_interval)
+            continue
+        if job is None:
+            if exit_when_idle:
+                print(f"[{worker_id}] Queue is empty; exiting after {processed} job(s)")
+                return processed
+            if MODEL_IDLE_UNLOAD_SECONDS > 0:
+                model_registry.unload_idle(MODEL_IDLE_UNLOAD_SECONDS)
+            time.sleep(poll_interval)
+            continue
+        process_job(queue, job, worker_id, lease_seconds)
+        processed += 1
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a worker that processes queued pipeline jobs.")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}", help="Unique name of this worker (default: hostname-pid)")
+    parser.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS, help="How long a claimed job stays reserved without a heartbeat")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL_SECONDS, help="Seconds to wait between polls of an empty queue")
+    parser.add_argument("--kinds", nargs="+", choices=sorted(JOB_HANDLERS), help="Only process these job kinds (default: all)")
+    parser.add_argument("--exit-when-idle", action="store_true", help="Exit once the queue is empty instead of polling forever")
+    parser.add_argument("--api-url", help="Claim jobs through this API instead of opening the job database (required on other hosts)")
+    args = parser.parse_args()
+    try:
+        run_worker(args.worker_id, args.lease_seconds, args.poll_interval, args.kinds, args.exit_when_idle, args.api_url)
+    except KeyboardInterrupt:
+        print(f"[{args.worker_id}] Stopped")
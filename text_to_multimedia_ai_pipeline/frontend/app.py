@@ -1,6 +1,8 @@
 import streamlit as st
 import requests
 import os # For joining paths
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED # For generating assets concurrently
+from backend_client import BackendClient, BackendJobError, BackendStatusCache, HEALTH_CACHE_TTL_SECONDS
 # import traceback # For debugging potential errors if running locally
 
 st.title("Text-to-Multimedia AI Pipeline")
@@ -19,23 +21,70 @@ if 'generated_sfx_path' not in st.session_state:
 if 'lipsynced_video_path' not in st.session_state:
     st.session_state.lipsynced_video_path = None
 
-# --- Backend Status (existing code) ---
+# --- Backend Client (one pooled keep-alive session, shared across reruns and sessions) ---
+@st.cache_resource
+def get_backend_client():
+    return BackendClient()
+
+@st.cache_resource
+def get_backend_status_cache():
+    return BackendStatusCache(get_backend_client())
+
+backend_client = get_backend_client()
+
+# --- Backend Status ---
+# Served from a short-lived cache that refreshes in the background; the fragment re-renders
+# on its own so the first result shows up without waiting for the next user interaction.
 st.header("Backend Status")
-backend_url_health = "http://localhost:8000/health"
-try:
-    response_health = requests.get(backend_url_health)
-    if response_health.status_code == 200:
-        status = response_health.json().get("status", "unknown")
-        st.success(f"Backend is {status}!")
+
+@st.fragment(run_every=HEALTH_CACHE_TTL_SECONDS)
+def render_backend_status():
+    backend_status = get_backend_status_cache().get()
+    if backend_status is None:
+        st.info("Checking backend status...")
     else:
-        st.error(f"Backend (health check) returned status code: {response_health.status_code}")
-except requests.exceptions.ConnectionError:
-    st.error("Failed to connect to the backend for health check. Ensure it's running.")
-except Exception as e:
-    st.error(f"An error occurred during health check: {e}")
+        is_healthy, status_message = backend_status
+        if is_healthy:
+            st.success(status_message)
+        else:
+            st.error(status_message)
+
+render_backend_status()
 
 PROJECT_BASE_PATH_FOR_FILES = "text_to_multimedia_ai_pipeline"
 
+def resolve_backend_media(data, path_key, media_label):
+    """Returns (data, path relative to the project, local path) once the media file the backend
+    reported exists on disk; otherwise reports the problem in the UI and returns (None, None, None)."""
+    media_path_relative_to_project = data.get(path_key)
+    if not media_path_relative_to_project:
+        st.error(f"Backend did not return a {media_label} path.")
+        return None, None, None
+    path_for_os_exists = os.path.join(PROJECT_BASE_PATH_FOR_FILES, media_path_relative_to_project)
+    if not os.path.exists(path_for_os_exists):
+        st.error(f"{media_label[0].upper() + media_label[1:]} file not found by frontend at: {path_for_os_exists}")
+        return None, None, None
+    return data, media_path_relative_to_project, path_for_os_exists
+
+def report_backend_error(error, endpoint, action):
+    if isinstance(error, BackendJobError):
+        st.error(f"Failed to {action}. Backend responded: {error}")
+    elif isinstance(error, requests.exceptions.ConnectionError):
+        st.error(f"Failed to connect to the backend at {backend_client.url(endpoint)} to {action}.")
+    elif isinstance(error, requests.exceptions.Timeout):
+        st.error(f"Timed out waiting for the backend to {action}.")
+    else:
+        st.error(f"Unexpected error while trying to {action}: {error}")
+
+def request_backend_media(endpoint, payload, path_key, action, media_label):
+    """Run a backend generation request that produces a media file; see resolve_backend_media."""
+    try:
+        data = backend_client.run_job(endpoint, payload)
+    except Exception as e:
+        report_backend_error(e, endpoint, action)
+        return None, None, None
+    return resolve_backend_media(data, path_key, media_label)
+
 def reset_downstream_media():
     st.session_state.generated_video_path = None
     st.session_state.generated_speech_path = None
@@ -60,36 +109,19 @@ st.header("Generate Image")
 style_options_img = ["None", "Photographic", "Illustration", "Animation", "Cinematic", "Sketch"]
 selected_style_img = st.selectbox("Select style:", style_options_img, key="style_selectbox_img")
 prompt_text_input_img = st.text_area("Enter your image prompt:", height=100, key="prompt_text_area_img")
-backend_url_generate_image = "http://localhost:8000/generate-image"
 if st.button("Generate Image"):
     if prompt_text_input_img:
         final_prompt_img = prompt_text_input_img
         if selected_style_img != "None":
             final_prompt_img = f"{selected_style_img} style: {prompt_text_input_img}"
         with st.spinner("Generating image..."):
-            try:
-                payload = {"prompt": final_prompt_img}
-                response_generate = requests.post(backend_url_generate_image, json=payload)
-                if response_generate.status_code == 200:
-                    data = response_generate.json()
-                    image_path_relative_to_project = data.get("image_path")
-                    if image_path_relative_to_project:
-                        path_for_os_exists = os.path.join(PROJECT_BASE_PATH_FOR_FILES, image_path_relative_to_project)
-                        if os.path.exists(path_for_os_exists):
-                            st.image(path_for_os_exists, caption=f"Generated image for: {final_prompt_img[:70]}...")
-                            st.success(data.get("message", "Image generated!"))
-                            st.session_state.generated_image_path = image_path_relative_to_project
-                            reset_downstream_media()
-                        else:
-                            st.error(f"Image file not found by frontend at path: {path_for_os_exists}")
-                    else:
-                        st.error("Backend did not return an image path.")
-                else:
-                    st.error(f"Failed to generate image. Backend responded: {response_generate.status_code} - {response_generate.text}")
-            except requests.exceptions.ConnectionError:
-                st.error(f"Failed to connect to image generation backend at {backend_url_generate_image}.")
-            except Exception as e:
-                st.error(f"Unexpected error during image generation: {e}")
+            data, image_path_relative_to_project, path_for_os_exists = request_backend_media(
+                "/generate-image", {"prompt": final_prompt_img}, "image_path", "generate image", "image")
+            if data:
+                st.image(path_for_os_exists, caption=f"Generated image for: {final_prompt_img[:70]}...")
+                st.success(data.get("message", "Image generated!"))
+                st.session_state.generated_image_path = image_path_relative_to_project
+                reset_downstream_media()
     else:
         st.warning("Please enter a prompt.")
 
@@ -100,31 +132,15 @@ if st.session_state.generated_image_path:
     motion_presets_video = ["None", "Slow Pan Right", "Slow Pan Left", "Slow Zoom In", "Slow Zoom Out", "Tilt Up", "Tilt Down", "Dolly Zoom", "Gentle Rotation Clockwise", "Gentle Rotation Counter-Clockwise", "Subtle Object Sway", "Lighting Flicker"]
     selected_motion_video = st.selectbox("Select motion type:", motion_presets_video, key="motion_type_selectbox_video")
     if st.button("Generate Video"):
-        backend_url_generate_video = "http://localhost:8000/generate-video"
         with st.spinner("Generating video..."):
-            try:
-                payload = {"image_path": st.session_state.generated_image_path, "motion_type": selected_motion_video}
-                response_generate_video = requests.post(backend_url_generate_video, json=payload)
-                if response_generate_video.status_code == 200:
-                    video_data = response_generate_video.json()
-                    video_path_relative_to_project = video_data.get("video_path")
-                    if video_path_relative_to_project:
-                        path_for_os_exists_video = os.path.join(PROJECT_BASE_PATH_FOR_FILES, video_path_relative_to_project)
-                        if os.path.exists(path_for_os_exists_video):
-                            st.session_state.generated_video_path = video_path_relative_to_project
-                            reset_audio_media()
-                            st.video(path_for_os_exists_video)
-                            st.success(video_data.get("message", "Video generated!"))
-                        else:
-                            st.error(f"Video file not found by frontend at path: {path_for_os_exists_video}")
-                    else:
-                        st.error("Backend did not return a video path.")
-                else:
-                    st.error(f"Failed to generate video. Backend responded: {response_generate_video.status_code} - {response_generate_video.text}")
-            except requests.exceptions.ConnectionError:
-                st.error(f"Failed to connect to video generation backend at {backend_url_generate_video}.")
-            except Exception as e:
-                st.error(f"Unexpected error during video generation: {e}")
+            payload = {"image_path": st.session_state.generated_image_path, "motion_type": selected_motion_video}
+            video_data, video_path_relative_to_project, path_for_os_exists_video = request_backend_media(
+                "/generate-video", payload, "video_path", "generate video", "video")
+            if video_data:
+                st.session_state.generated_video_path = video_path_relative_to_project
+                reset_audio_media()
+                st.video(path_for_os_exists_video)
+                st.success(video_data.get("message", "Video generated!"))
 else:
     st.info("Generate an image first to enable video generation.")
 
@@ -135,34 +151,18 @@ tts_voice_options = ["Male Young Professional", "Female Young Friendly", "Male M
 tts_selected_voice = st.selectbox("Select Voice:", tts_voice_options, key="tts_voice_selectbox")
 tts_emotion_options = ["Neutral", "Happy", "Calm", "Dramatic"]
 tts_selected_emotion = st.selectbox("Select Emotion:", tts_emotion_options, key="tts_emotion_selectbox")
-backend_url_generate_speech = "http://localhost:8000/generate-speech"
 if st.button("Generate Speech"):
     if tts_text_input:
         with st.spinner("Generating speech..."):
-            try:
-                payload = {"text": tts_text_input, "voice": tts_selected_voice, "emotion": tts_selected_emotion}
-                response_generate_speech = requests.post(backend_url_generate_speech, json=payload)
-                if response_generate_speech.status_code == 200:
-                    speech_data = response_generate_speech.json()
-                    speech_path_relative_to_project = speech_data.get("audio_path")
-                    if speech_path_relative_to_project:
-                        path_for_os_exists_speech = os.path.join(PROJECT_BASE_PATH_FOR_FILES, speech_path_relative_to_project)
-                        if os.path.exists(path_for_os_exists_speech):
-                            st.session_state.generated_speech_path = speech_path_relative_to_project
-                            reset_music_sfx_lipsync()
-                            st.audio(path_for_os_exists_speech, format='audio/wav')
-                            st.success(speech_data.get("message", "Speech generated!"))
-                            st.caption(f"Voice: {speech_data.get('voice_used', 'N/A')}, Emotion: {speech_data.get('emotion_used', 'N/A')}")
-                        else:
-                            st.error(f"Speech audio file not found by frontend at: {path_for_os_exists_speech}")
-                    else:
-                        st.error("Backend did not return a speech audio path.")
-                else:
-                    st.error(f"Failed to generate speech. Backend responded: {response_generate_speech.status_code} - {response_generate_speech.text}")
-            except requests.exceptions.ConnectionError:
-                st.error(f"Failed to connect to speech generation backend at {backend_url_generate_speech}.")
-            except Exception as e:
-                st.error(f"Unexpected error during speech generation: {e}")
+            payload = {"text": tts_text_input, "voice": tts_selected_voice, "emotion": tts_selected_emotion}
+            speech_data, speech_path_relative_to_project, path_for_os_exists_speech = request_backend_media(
+                "/generate-speech", payload, "audio_path", "generate speech", "speech audio")
+            if speech_data:
+                st.session_state.generated_speech_path = speech_path_relative_to_project
+                reset_music_sfx_lipsync()
+                st.audio(path_for_os_exists_speech, format='audio/wav')
+                st.success(speech_data.get("message", "Speech generated!"))
+                st.caption(f"Voice: {speech_data.get('voice_used', 'N/A')}, Emotion: {speech_data.get('emotion_used', 'N/A')}")
     else:
         st.warning("Please enter text to synthesize.")
 
@@ -171,34 +171,18 @@ st.header("Music Generation")
 music_style_options = ["Ambient", "Upbeat", "Dramatic", "Peaceful", "Electronic", "Acoustic", "Experimental", "Cinematic"]
 music_selected_style = st.selectbox("Select Music Style:", music_style_options, key="music_style_selectbox")
 music_duration_seconds = st.number_input("Duration (seconds):", min_value=5, max_value=60, value=30, step=5, key="music_duration_numberinput")
-backend_url_generate_music = "http://localhost:8000/generate-music"
 if st.button("Generate Music"):
     with st.spinner("Generating music..."):
-        try:
-            payload = {"style": music_selected_style, "duration_seconds": music_duration_seconds}
-            response_generate_music = requests.post(backend_url_generate_music, json=payload)
-            if response_generate_music.status_code == 200:
-                music_data = response_generate_music.json()
-                music_path_relative_to_project = music_data.get("audio_path")
-                if music_path_relative_to_project:
-                    path_for_os_exists_music = os.path.join(PROJECT_BASE_PATH_FOR_FILES, music_path_relative_to_project)
-                    if os.path.exists(path_for_os_exists_music):
-                        st.session_state.generated_music_path = music_path_relative_to_project
-                        st.session_state.generated_sfx_path = None
-                        st.session_state.lipsynced_video_path = None # Lip sync might be affected by new music if used in final assembly
-                        st.audio(path_for_os_exists_music, format='audio/wav')
-                        st.success(music_data.get("message", "Music generated!"))
-                        st.caption(f"Style: {music_data.get('style_used', 'N/A')}, Duration: {music_data.get('duration_seconds', 'N/A')}s")
-                    else:
-                        st.error(f"Music audio file not found by frontend at: {path_for_os_exists_music}")
-                else:
-                    st.error("Backend did not return a music audio path.")
-            else:
-                st.error(f"Failed to generate music. Backend responded: {response_generate_music.status_code} - {response_generate_music.text}")
-        except requests.exceptions.ConnectionError:
-            st.error(f"Failed to connect to music generation backend at {backend_url_generate_music}.")
-        except Exception as e:
-            st.error(f"Unexpected error during music generation: {e}")
+        payload = {"style": music_selected_style, "duration_seconds": music_duration_seconds}
+        music_data, music_path_relative_to_project, path_for_os_exists_music = request_backend_media(
+            "/generate-music", payload, "audio_path", "generate music", "music audio")
+        if music_data:
+            st.session_state.generated_music_path = music_path_relative_to_project
+            st.session_state.generated_sfx_path = None
+            st.session_state.lipsynced_video_path = None # Lip sync might be affected by new music if used in final assembly
+            st.audio(path_for_os_exists_music, format='audio/wav')
+            st.success(music_data.get("message", "Music generated!"))
+            st.caption(f"Style: {music_data.get('style_used', 'N/A')}, Duration: {music_data.get('duration_seconds', 'N/A')}s")
 
 # --- Sound Effects (SFX) Generation ---
 st.header("Sound Effects (SFX)")
@@ -206,37 +190,88 @@ sfx_category_options = ["Nature", "Urban", "Mechanical", "Human", "Fantasy", "Sc
 sfx_selected_category = st.selectbox("Select SFX Category:", sfx_category_options, key="sfx_category_selectbox")
 sfx_description_input = st.text_input("Describe the sound effect:", key="sfx_description_input")
 st.caption("Note: A pre-generated SFX library will also be available for common sounds.")
-backend_url_generate_sfx = "http://localhost:8000/generate-sfx"
 if st.button("Generate SFX"):
     if sfx_description_input:
         with st.spinner("Generating SFX..."):
-            try:
-                payload = {"category": sfx_selected_category, "description": sfx_description_input}
-                response_generate_sfx = requests.post(backend_url_generate_sfx, json=payload)
-                if response_generate_sfx.status_code == 200:
-                    sfx_data = response_generate_sfx.json()
-                    sfx_path_relative_to_project = sfx_data.get("audio_path")
-                    if sfx_path_relative_to_project:
-                        path_for_os_exists_sfx = os.path.join(PROJECT_BASE_PATH_FOR_FILES, sfx_path_relative_to_project)
-                        if os.path.exists(path_for_os_exists_sfx):
-                            st.session_state.generated_sfx_path = sfx_path_relative_to_project
-                            st.session_state.lipsynced_video_path = None # Lip sync not directly affected, but good practice if sfx were part of a scene mix
-                            st.audio(path_for_os_exists_sfx, format='audio/wav')
-                            st.success(sfx_data.get("message", "SFX generated!"))
-                            st.caption(f"Category: {sfx_data.get('category_used', 'N/A')}, Description: {sfx_data.get('description_logged', 'N/A')}")
-                        else:
-                            st.error(f"SFX audio file not found by frontend at: {path_for_os_exists_sfx}")
-                    else:
-                        st.error("Backend did not return an SFX audio path.")
-                else:
-                    st.error(f"Failed to generate SFX. Backend responded: {response_generate_sfx.status_code} - {response_generate_sfx.text}")
-            except requests.exceptions.ConnectionError:
-                st.error(f"Failed to connect to SFX generation backend at {backend_url_generate_sfx}.")
-            except Exception as e:
-                st.error(f"Unexpected error during SFX generation: {e}")
+            payload = {"category": sfx_selected_category, "description": sfx_description_input}
+            sfx_data, sfx_path_relative_to_project, path_for_os_exists_sfx = request_backend_media(
+                "/generate-sfx", payload, "audio_path", "generate SFX", "SFX audio")
+            if sfx_data:
+                st.session_state.generated_sfx_path = sfx_path_relative_to_project
+                st.session_state.lipsynced_video_path = None # Lip sync not directly affected, but good practice if sfx were part of a scene mix
+                st.audio(path_for_os_exists_sfx, format='audio/wav')
+                st.success(sfx_data.get("message", "SFX generated!"))
+                st.caption(f"Category: {sfx_data.get('category_used', 'N/A')}, Description: {sfx_data.get('description_logged', 'N/A')}")
     else:
         st.warning("Please describe the sound effect.")
 
+# --- Generate All Audio Assets ---
+# Speech, music and SFX do not depend on each other, so they are submitted together and each
+# result is shown as soon as it is ready: the scene takes as long as the slowest asset.
+st.header("Generate All Audio Assets")
+st.caption("Uses the text, voice, music and SFX settings above.")
+if st.button("Generate All Audio"):
+    audio_assets = {}
+    if tts_text_input:
+        audio_assets["speech"] = {
+            "label": "Speech", "endpoint": "/generate-speech", "action": "generate speech", "media_label": "speech audio",
+            "payload": {"text": tts_text_input, "voice": tts_selected_voice, "emotion": tts_selected_emotion},
+            "session_key": "generated_speech_path",
+            "caption": lambda data: f"Voice: {data.get('voice_used', 'N/A')}, Emotion: {data.get('emotion_used', 'N/A')}",
+        }
+    else:
+        st.warning("Skipping speech: enter text to synthesize above.")
+    audio_assets["music"] = {
+        "label": "Music", "endpoint": "/generate-music", "action": "generate music", "media_label": "music audio",
+        "payload": {"style": music_selected_style, "duration_seconds": music_duration_seconds},
+        "session_key": "generated_music_path",
+        "caption": lambda data: f"Style: {data.get('style_used', 'N/A')}, Duration: {data.get('duration_seconds', 'N/A')}s",
+    }
+    if sfx_description_input:
+        audio_assets["sfx"] = {
+            "label": "SFX", "endpoint": "/generate-sfx", "action": "generate SFX", "media_label": "SFX audio",
+            "payload": {"category": sfx_selected_category, "description": sfx_description_input},
+            "session_key": "generated_sfx_path",
+            "caption": lambda data: f"Category: {data.get('category_used', 'N/A')}, Description: {data.get('description_logged', 'N/A')}",
+        }
+    else:
+        st.warning("Skipping SFX: describe the sound effect above.")
+
+    if "speech" in audio_assets:
+        st.session_state.lipsynced_video_path = None # New speech invalidates any previous lip sync
+    placeholders = {name: st.empty() for name in audio_assets}
+    # Worker threads only record job status here; all Streamlit calls stay on the script thread.
+    job_statuses = {name: "submitted" for name in audio_assets}
+
+    def make_status_callback(name):
+        return lambda status: job_statuses.__setitem__(name, status)
+
+    with ThreadPoolExecutor(max_workers=len(audio_assets)) as executor:
+        futures = {
+            executor.submit(backend_client.run_job, asset["endpoint"], asset["payload"], make_status_callback(name)): name
+            for name, asset in audio_assets.items()
+        }
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = futures[future]
+                asset = audio_assets[name]
+                with placeholders[name].container():
+                    st.subheader(asset["label"])
+                    if future.exception() is not None:
+                        report_backend_error(future.exception(), asset["endpoint"], asset["action"])
+                        continue
+                    data, path_relative_to_project, path_for_os_exists = resolve_backend_media(future.result(), "audio_path", asset["media_label"])
+                    if data:
+                        st.session_state[asset["session_key"]] = path_relative_to_project
+                        st.audio(path_for_os_exists, format='audio/wav')
+                        st.success(data.get("message", f"{asset['label']} generated!"))
+                        st.caption(asset["caption"](data))
+            for future in pending:
+                name = futures[future]
+                placeholders[name].info(f"{audio_assets[name]['label']}: {job_statuses[name]}...")
+
 # --- Lip Sync Video Section ---
 st.header("Lip Sync Video")
 if st.session_state.generated_video_path and st.session_state.generated_speech_path:
@@ -244,35 +279,16 @@ if st.session_state.generated_video_path and st.session_state.generated_speech_p
     st.write(f"Using speech audio: `{st.session_state.generated_speech_path}`")
 
     if st.button("Apply Lip Sync"):
-        backend_url_sync_lips = "http://localhost:8000/sync-lips"
         with st.spinner("Applying lip sync..."):
-            try:
-                payload = {
-                    "video_path": st.session_state.generated_video_path,
-                    "audio_path": st.session_state.generated_speech_path
-                }
-                response_sync_lips = requests.post(backend_url_sync_lips, json=payload)
-
-                if response_sync_lips.status_code == 200:
-                    lipsync_data = response_sync_lips.json()
-                    lipsynced_video_path_relative = lipsync_data.get("lipsynced_video_path")
-
-                    if lipsynced_video_path_relative:
-                        path_for_os_exists_lipsync = os.path.join(PROJECT_BASE_PATH_FOR_FILES, lipsynced_video_path_relative)
-                        if os.path.exists(path_for_os_exists_lipsync):
-                            st.session_state.lipsynced_video_path = lipsynced_video_path_relative
-                            st.video(path_for_os_exists_lipsync)
-                            st.success(lipsync_data.get("message", "Lip sync applied!"))
-                        else:
-                            st.error(f"Lipsynced video file not found by frontend at: {path_for_os_exists_lipsync}")
-                            st.info(f"Backend returned: {lipsynced_video_path_relative}. Backend response: {lipsync_data}")
-                    else:
-                        st.error("Backend did not return a lipsynced video path.")
-                else:
-                    st.error(f"Failed to apply lip sync. Backend responded: {response_sync_lips.status_code} - {response_sync_lips.text}")
-            except requests.exceptions.ConnectionError:
-                st.error(f"Failed to connect to the lip sync backend at {backend_url_sync_lips}.")
-            except Exception as e:
-                st.error(f"An unexpected error occurred during lip sync: {e}")
+            payload = {
+                "video_path": st.session_state.generated_video_path,
+                "audio_path": st.session_state.generated_speech_path
+            }
+            lipsync_data, lipsynced_video_path_relative, path_for_os_exists_lipsync = request_backend_media(
+                "/sync-lips", payload, "lipsynced_video_path", "apply lip sync", "lipsynced video")
+            if lipsync_data:
+                st.session_state.lipsynced_video_path = lipsynced_video_path_relative
+                st.video(path_for_os_exists_lipsync)
+                st.success(lipsync_data.get("message", "Lip sync applied!"))
 else:
     st.info("Please generate a video and speech audio first to enable lip sync.")
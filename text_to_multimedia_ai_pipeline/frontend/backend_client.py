@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+import uuid
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+BACKEND_BASE_URL = os.environ.get("PIPELINE_BACKEND_URL", "http://localhost:8000")
+CONNECT_TIMEOUT_SECONDS = 3.05
+READ_TIMEOUT_SECONDS = 300 # Generation requests can take minutes once real models are integrated
+HEALTH_TIMEOUT_SECONDS = 2
+HEALTH_CACHE_TTL_SECONDS = 5
+JOB_POLL_INTERVAL_SECONDS = 0.5
+JOB_TIMEOUT_SECONDS = 30 * 60 # Give up on a queued job that has not finished by then (e.g. no worker is running)
+
+
+class BackendJobError(Exception):
+    """A generation request the backend rejected or a job that finished as failed."""
+
+
+class BackendClient:
+    """One pooled keep-alive HTTP session for all backend calls.
+
+    Only connection errors and 502/503/504 responses are retried, with exponential backoff;
+    each POST carries an Idempotency-Key, so a retried POST that did reach the backend
+    returns its stored result instead of generating the asset a second time. Read errors
+    (timeouts, dropped responses) are not retried and raise to the caller: the backend may
+    still be processing the request, and resending it would only wait for the same job.
+    """
+
+    def __init__(self, base_url=BACKEND_BASE_URL, retries=3, backoff_factor=0.5, pool_maxsize=10):
+        self.base_url = base_url.rstrip("/")
+        retry = Retry(
+            total=retries,
+            read=0,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "POST"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def url(self, path):
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def get(self, path, timeout=READ_TIMEOUT_SECONDS):
+        return self.session.get(self.url(path), timeout=(CONNECT_TIMEOUT_SECONDS, timeout))
+
+    def post(self, path, payload, timeout=READ_TIMEOUT_SECONDS, headers=None):
+        headers = {"Idempotency-Key": uuid.uuid4().hex, **(headers or {})}
+        return self.session.post(self.url(path), json=payload, headers=headers, timeout=(CONNECT_TIMEOUT_SECONDS, timeout))
+
+    def run_job(self, path, payload, on_status=None, poll_interval=JOB_POLL_INTERVAL_SECONDS, timeout=JOB_TIMEOUT_SECONDS):
+        """Run a generation request to completion and return the backend's result.
+
+        The request asks for asynchronous handling (`Prefer: respond-async`). A backend that
+        queues jobs answers 202 with a job id, which is then polled via /jobs/{job_id};
+        on_status(status) is called with "queued"/"running" as it progresses. A backend that
+        runs jobs inline simply answers 200 with the result. Raises BackendJobError if the
+        job has not finished within timeout seconds.
+        """
+        response = self.post(path, payload, headers={"Prefer": "respond-async"})
+        if response.status_code == 200:
+            return response.json()
+        if response.status_code != 202:
+            raise BackendJobError(f"{response.status_code} - {response.text}")
+        job_id = response.json()["job_id"]
+        deadline = time.monotonic() + timeout
+        while True:
+            job_response = self.get(f"/jobs/{job_id}")
+            if job_response.status_code != 200:
+                raise BackendJobError(f"{job_response.status_code} - {job_response.text}")
+            job = job_response.json()
+            if job["status"] == "succeeded":
+                return job["result"]
+            if job["status"] == "failed":
+                raise BackendJobError(f"{job['error_code'] or 500} - {job['error']}")
+            if time.monotonic() >= deadline:
+                raise BackendJobError(f"Timed out after {timeout:.0f}s waiting for job {job_id} (still {job['status']})")
+            if on_status is not None:
+                on_status(job["status"])
+            time.sleep(poll_interval)
+
+    def check_health(self):
+        """Returns (is_healthy, message) for display; never raises."""
+        try:
+            response = self.get("/health", timeout=HEALTH_TIMEOUT_SECONDS)
+            if response.status_code == 200:
+                status = response.json().get("status", "unknown")
+                return True, f"Backend is {status}!"
+            return False, f"Backend (health check) returned status code: {response.status_code}"
+        except requests.exceptions.ConnectionError:
+            return False, "Failed to connect to the backend for health check. Ensure it's running."
+        except Exception as e:
+            return False, f"An error occurred during health check: {e}"
+
+
+class BackendStatusCache:
+    """Serves the last known backend health immediately and refreshes it in the background
+    once it is older than ttl_seconds, so rendering a page never waits on a health check."""
+
+    def __init__(self, client, ttl_seconds=HEALTH_CACHE_TTL_SECONDS):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._status = None
+        self._checked_at = None
+        self._refreshing = False
+
+    def get(self):
+        """Returns (is_healthy, message), or None if the first check has not finished yet."""
+        with self._lock:
+            stale = self._checked_at is None or time.monotonic() - self._checked_at >= self.ttl_seconds
+            if stale and not self._refreshing:
+                self._refreshing = True
+                threading.Thread(target=self._refresh, daemon=True).start()
+            return self._status
+
+    def _refresh(self):
+        status = self.client.check_health()
+        with self._lock:
+            self._status = status
+            self._checked_at = time.monotonic()
+            self._refreshing = False
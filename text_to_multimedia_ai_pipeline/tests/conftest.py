@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The backend and frontend are not installed packages; make their modules importable from the tests.
+PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+for source_dir in ("backend", "frontend"):
+    sys.path.insert(0, os.path.join(PROJECT_DIR, source_dir))
@@ -198,3 +198,40 @@ def test_sync_lips_placeholder():
     # Note: The actual generated lipsynced video (a copy in this placeholder) is on the server side.
     # We don't attempt to clean it from here as part of this specific unit/integration test of the API contract.
     # Its existence could be checked if the test had access to the server's data folder directly after the call.
+
+def test_idempotency_key_replays_original_result():
+    idempotency_key = f"test-speech-{os.getpid()}-{os.urandom(4).hex()}"
+    headers = {"Idempotency-Key": idempotency_key}
+    payload = {"text": "Idempotent speech", "voice": "Test Voice", "emotion": "Test Emotion"}
+    first = requests.post(f"{BASE_URL}/generate-speech", json=payload, headers=headers)
+    assert first.status_code == 200, f"Request failed: {first.text}"
+    retry = requests.post(f"{BASE_URL}/generate-speech", json=payload, headers=headers)
+    assert retry.status_code == 200, f"Retry failed: {retry.text}"
+    assert retry.json() == first.json()
+
+    mismatched = requests.post(f"{BASE_URL}/generate-speech", json={**payload, "text": "Other"}, headers=headers)
+    assert mismatched.status_code == 422
+
+    job_response = requests.get(f"{BASE_URL}/jobs/{first.json()['job_id']}")
+    assert job_response.status_code == 200
+    job = job_response.json()
+    assert job["status"] == "succeeded"
+    assert job["kind"] == "generate-speech"
+    assert job["payload"] == payload
+    assert job["artifact_paths"] == [first.json()["audio_path"]]
+    assert job["attempts"] == 1
+
+def test_concurrent_generations_get_separate_outputs():
+    from concurrent.futures import ThreadPoolExecutor
+    requests_to_send = [
+        ("generate-speech", {"text": "Concurrent speech", "voice": "Test Voice", "emotion": "Test Emotion"}),
+        ("generate-music", {"style": "Test Style", "duration_seconds": 5}),
+        ("generate-sfx", {"category": "Test Category", "description": "Concurrent sound"}),
+        ("generate-sfx", {"category": "Test Category", "description": "Concurrent sound"}),
+    ]
+    with ThreadPoolExecutor(max_workers=len(requests_to_send)) as executor:
+        responses = list(executor.map(lambda item: requests.post(f"{BASE_URL}/{item[0]}", json=item[1]), requests_to_send))
+    for response in responses:
+        assert response.status_code == 200, f"Request failed: {response.text}"
+    audio_paths = [response.json()["audio_path"] for response in responses]
+    assert len(set(audio_paths)) == len(audio_paths)
@@ -0,0 +1,111 @@
+import threading
+import time
+
+import pytest
+
+from backend_client import BackendClient, BackendJobError, BackendStatusCache
+
+class SlowHealthClient:
+    def __init__(self, delay_seconds):
+        self.delay_seconds = delay_seconds
+        self.calls = 0
+        self.release = threading.Event()
+
+    def check_health(self):
+        self.calls += 1
+        self.release.wait(self.delay_seconds)
+        return True, "Backend is healthy!"
+
+def wait_for_status(cache, timeout=2):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = cache.get()
+        if status is not None:
+            return status
+        time.sleep(0.01)
+    return None
+
+def test_status_cache_does_not_block_on_slow_health_check():
+    client = SlowHealthClient(delay_seconds=5)
+    cache = BackendStatusCache(client, ttl_seconds=60)
+    started = time.perf_counter()
+    assert cache.get() is None
+    assert cache.get() is None
+    assert time.perf_counter() - started < 0.5
+    client.release.set()
+    assert wait_for_status(cache) == (True, "Backend is healthy!")
+    assert client.calls == 1 # Concurrent reads share one in-flight check
+
+def test_status_cache_refreshes_after_ttl():
+    client = SlowHealthClient(delay_seconds=0)
+    cache = BackendStatusCache(client, ttl_seconds=0.05)
+    assert wait_for_status(cache) == (True, "Backend is healthy!")
+    cached_calls = client.calls
+    cache.get()
+    assert client.calls == cached_calls
+    time.sleep(0.1)
+    cache.get() # Stale: returns the cached value and refreshes in the background
+    deadline = time.monotonic() + 2
+    while client.calls == cached_calls and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert client.calls == cached_calls + 1
+
+def test_unreachable_backend_reports_connection_error():
+    client = BackendClient("http://127.0.0.1:9", retries=0)
+    is_healthy, message = client.check_health()
+    assert not is_healthy
+    assert "Failed to connect" in message
+    assert client.url("/health") == "http://127.0.0.1:9/health"
+
+def test_read_timeouts_are_not_retried():
+    retry = BackendClient("http://backend").session.get_adapter("http://backend").max_retries
+    assert retry.total == 3
+    assert retry.read == 0 # A slow generation must not be re-sent and waited on again
+
+class FakeResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+        self.text = str(body)
+
+    def json(self):
+        return self.body
+
+class FakeQueueSession:
+    """Mimics a backend in queue mode: POST answers 202, then the job runs to completion."""
+    def __init__(self, job_statuses, final_job):
+        self.job_statuses = list(job_statuses)
+        self.final_job = final_job
+        self.posted_headers = None
+
+    def post(self, url, json, headers, timeout):
+        self.posted_headers = headers
+        return FakeResponse(202, {"job_id": "job-1", "status": "queued", "status_url": "/jobs/job-1"})
+
+    def get(self, url, timeout):
+        assert url.endswith("/jobs/job-1")
+        if self.job_statuses:
+            return FakeResponse(200, {"status": self.job_statuses.pop(0)})
+        return FakeResponse(200, self.final_job)
+
+def test_run_job_polls_queued_job_until_it_succeeds():
+    client = BackendClient("http://backend")
+    client.session = FakeQueueSession(["queued", "running"], {"status": "succeeded", "result": {"audio_path": "a.wav"}})
+    seen_statuses = []
+    result = client.run_job("/generate-music", {"style": "s"}, on_status=seen_statuses.append, poll_interval=0)
+    assert result == {"audio_path": "a.wav"}
+    assert seen_statuses == ["queued", "running"]
+    assert client.session.posted_headers["Prefer"] == "respond-async"
+    assert client.session.posted_headers["Idempotency-Key"]
+
+def test_run_job_raises_for_failed_job():
+    client = BackendClient("http://backend")
+    client.session = FakeQueueSession([], {"status": "failed", "error_code": 404, "error": "Input image not found"})
+    with pytest.raises(BackendJobError, match="404 - Input image not found"):
+        client.run_job("/generate-video", {"image_path": "x.png", "motion_type": "None"}, poll_interval=0)
+
+def test_run_job_gives_up_after_timeout():
+    client = BackendClient("http://backend")
+    client.session = FakeQueueSession(["queued"] * 1000, {"status": "succeeded", "result": {}})
+    with pytest.raises(BackendJobError, match="Timed out after 0s waiting for job job-1 \\(still queued\\)"):
+        client.run_job("/generate-sfx", {"category": "c"}, poll_interval=0.01, timeout=0.05)
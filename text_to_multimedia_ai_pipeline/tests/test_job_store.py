@@ -0,0 +1,117 @@
+import time
+
+from job_store import JobStore, JOB_STATUS_QUEUED, JOB_STATUS_RUNNING, JOB_STATUS_SUCCEEDED, JOB_STATUS_FAILED
+
+def test_create_and_complete_job(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job, created = store.create_job("generate-speech", {"text": "hi", "voice": "v", "emotion": "e"}, worker_id="api-1", lease_seconds=30)
+    assert created
+    assert job["status"] == JOB_STATUS_RUNNING
+    assert job["worker_id"] == "api-1"
+    assert job["lease_expires_at"] > time.time()
+    assert job["attempts"] == 1
+    assert job["payload"] == {"text": "hi", "voice": "v", "emotion": "e"}
+
+    result = {"message": "ok", "audio_path": "data/generated_audio/speech/a.wav", "voice_used": "v"}
+    store.mark_succeeded(job["id"], result, worker_id="api-1")
+    job = store.get_job(job["id"])
+    assert job["status"] == JOB_STATUS_SUCCEEDED
+    assert job["result"] == result
+    assert job["artifact_paths"] == ["data/generated_audio/speech/a.wav"]
+    assert job["duration_seconds"] is not None and job["duration_seconds"] >= 0
+
+def test_idempotency_key_returns_existing_job(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    first, created_first = store.create_job("generate-sfx", {"category": "c"}, idempotency_key="key-1")
+    second, created_second = store.create_job("generate-sfx", {"category": "c"}, idempotency_key="key-1")
+    assert created_first and not created_second
+    assert second["id"] == first["id"]
+    assert store.get_job_by_idempotency_key("key-1")["id"] == first["id"]
+
+def test_failed_job_can_be_claimed_for_retry_once(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job, _ = store.create_job("generate-image", {"prompt": "p"}, idempotency_key="key-2", worker_id="api-1", lease_seconds=30)
+    store.mark_failed(job["id"], "boom")
+    assert store.get_job(job["id"])["error"] == "boom"
+    assert store.mark_running(job["id"], "api-2", 30, from_statuses=(JOB_STATUS_FAILED,))
+    assert not store.mark_running(job["id"], "api-1", 30, from_statuses=(JOB_STATUS_FAILED,))
+    job = store.get_job(job["id"])
+    assert job["status"] == JOB_STATUS_RUNNING
+    assert job["worker_id"] == "api-2"
+    assert job["attempts"] == 2
+    assert job["error"] is None
+
+def test_recovery_takes_over_only_jobs_with_expired_leases(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    store = JobStore(db_path)
+    crashed, _ = store.create_job("generate-music", {"style": "s", "duration_seconds": 5}, worker_id="api-crashed", lease_seconds=0.01)
+    live, _ = store.create_job("generate-music", {"style": "s", "duration_seconds": 6}, worker_id="api-live", lease_seconds=30)
+    queued, _ = store.create_job("generate-music", {"style": "s", "duration_seconds": 7})
+    exhausted, _ = store.create_job("generate-music", {"style": "s", "duration_seconds": 8}, worker_id="api-crashed", lease_seconds=30)
+    store.mark_failed(exhausted["id"], "first attempt")
+    store.mark_running(exhausted["id"], "api-crashed", 0.01, from_statuses=(JOB_STATUS_FAILED,))
+    store.close()
+    time.sleep(0.05)
+
+    # Simulate a restarted API process opening the same database while a sibling keeps running.
+    store = JobStore(db_path)
+    recovered = store.claim_next_job("api-restarted", lease_seconds=30, max_attempts=2, include_queued=False)
+    assert recovered["id"] == crashed["id"]
+    assert recovered["worker_id"] == "api-restarted"
+    assert recovered["attempts"] == 2
+    assert store.claim_next_job("api-restarted", lease_seconds=30, max_attempts=2, include_queued=False) is None
+    assert store.get_job(live["id"])["worker_id"] == "api-live" # Its owner is still heartbeating
+    assert store.get_job(queued["id"])["status"] == JOB_STATUS_QUEUED # Left for the workers
+    assert store.get_job(exhausted["id"])["status"] == JOB_STATUS_FAILED
+    assert "api-crashed" in store.get_job(exhausted["id"])["error"]
+
+def test_workers_claim_each_queued_job_once(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    first, _ = store.create_job("generate-sfx", {"n": 1})
+    second, _ = store.create_job("generate-image", {"n": 2})
+
+    claimed = store.claim_next_job("worker-a", lease_seconds=30, max_attempts=2)
+    assert claimed["id"] == first["id"]
+    assert claimed["status"] == JOB_STATUS_RUNNING
+    assert claimed["worker_id"] == "worker-a"
+    assert claimed["attempts"] == 1
+    assert store.claim_next_job("worker-b", lease_seconds=30, max_attempts=2, kinds=["generate-sfx"]) is None
+    assert store.claim_next_job("worker-b", lease_seconds=30, max_attempts=2)["id"] == second["id"]
+    assert store.claim_next_job("worker-c", lease_seconds=30, max_attempts=2) is None
+
+def test_expired_lease_is_reclaimed_and_stale_worker_cannot_complete(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job, _ = store.create_job("generate-music", {"n": 1})
+    store.claim_next_job("worker-a", lease_seconds=0.05, max_attempts=3)
+    assert store.heartbeat(job["id"], "worker-a", lease_seconds=0.05)
+    time.sleep(0.1)
+
+    reclaimed = store.claim_next_job("worker-b", lease_seconds=30, max_attempts=3)
+    assert reclaimed["id"] == job["id"]
+    assert reclaimed["worker_id"] == "worker-b"
+    assert reclaimed["attempts"] == 2
+    assert not store.heartbeat(job["id"], "worker-a", lease_seconds=30)
+    assert not store.mark_succeeded(job["id"], {"audio_path": "stale.wav"}, worker_id="worker-a")
+    assert store.mark_succeeded(job["id"], {"audio_path": "fresh.wav"}, worker_id="worker-b")
+    assert store.get_job(job["id"])["artifact_paths"] == ["fresh.wav"]
+
+def test_expired_lease_fails_job_after_max_attempts(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job, _ = store.create_job("generate-video", {"n": 1})
+    store.claim_next_job("worker-a", lease_seconds=0.01, max_attempts=1)
+    time.sleep(0.05)
+    assert store.claim_next_job("worker-b", lease_seconds=30, max_attempts=1) is None
+    job = store.get_job(job["id"])
+    assert job["status"] == JOB_STATUS_FAILED
+    assert "worker-a" in job["error"]
+
+def test_requeue_failed_job(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job, _ = store.create_job("generate-speech", {"n": 1})
+    store.claim_next_job("worker-a", lease_seconds=30, max_attempts=2)
+    store.mark_failed(job["id"], "Input not found", error_code=404, worker_id="worker-a")
+    assert store.get_job(job["id"])["error_code"] == 404
+    assert store.requeue(job["id"])
+    job = store.get_job(job["id"])
+    assert job["status"] == JOB_STATUS_QUEUED
+    assert job["worker_id"] is None and job["error"] is None
@@ -0,0 +1,68 @@
+import time
+
+from model_registry import ModelRegistry
+
+MB = 2**20
+
+def make_loader(name, load_calls):
+    def loader():
+        load_calls.append(name)
+        return f"{name}-weights"
+    return loader
+
+def test_models_load_on_first_use_only():
+    load_calls = []
+    registry = ModelRegistry()
+    registry.register("tts", make_loader("tts", load_calls), size_bytes=100 * MB)
+    assert load_calls == []
+    assert registry.get("tts") == "tts-weights"
+    assert registry.get("tts") == "tts-weights"
+    assert load_calls == ["tts"]
+    stats = registry.stats()[0]
+    assert stats["loaded"] and stats["load_seconds"] is not None
+
+def test_least_recently_used_model_is_unloaded_over_budget():
+    load_calls = []
+    unloaded = []
+    registry = ModelRegistry(memory_budget_bytes=250 * MB)
+    for name in ("image", "music", "speech"):
+        registry.register(name, make_loader(name, load_calls), size_bytes=100 * MB, unloader=lambda value: unloaded.append(value))
+    registry.get("image")
+    registry.get("music")
+    registry.get("image") # music is now the least recently used
+    registry.get("speech")
+    assert unloaded == ["music-weights"]
+    loaded = {entry["name"] for entry in registry.stats() if entry["loaded"]}
+    assert loaded == {"image", "speech"}
+    registry.get("music") # Reloaded on demand
+    assert load_calls == ["image", "music", "speech", "music"]
+
+def test_get_returns_model_even_if_unloaded_right_after_loading():
+    registry = ModelRegistry(memory_budget_bytes=100 * MB)
+    registry.register("tts", make_loader("tts", []), size_bytes=10 * MB)
+    enforce_budget = registry._enforce_budget
+    def enforce_budget_then_unload_idle(keep):
+        enforce_budget(keep)
+        registry.unload_idle(max_idle_seconds=0) # Another thread unloading idle models in between
+    registry._enforce_budget = enforce_budget_then_unload_idle
+    assert registry.get("tts") == "tts-weights"
+
+def test_models_in_use_are_not_unloaded():
+    registry = ModelRegistry(memory_budget_bytes=150 * MB)
+    registry.register("video", make_loader("video", []), size_bytes=100 * MB)
+    registry.register("lipsync", make_loader("lipsync", []), size_bytes=100 * MB)
+    with registry.use("video") as video_model:
+        assert video_model == "video-weights"
+        registry.get("lipsync")
+        assert {entry["name"] for entry in registry.stats() if entry["loaded"]} == {"video", "lipsync"}
+        assert registry.unload_idle(max_idle_seconds=0) == ["lipsync"]
+
+def test_idle_models_are_unloaded_but_modules_are_kept():
+    registry = ModelRegistry()
+    registry.register("sfx", make_loader("sfx", []), size_bytes=10 * MB)
+    registry.register_module("json")
+    registry.warm_up(["sfx", "json"])
+    assert registry.unload_idle(max_idle_seconds=60) == []
+    time.sleep(0.02)
+    assert registry.unload_idle(max_idle_seconds=0.01) == ["sfx"]
+    assert {entry["name"] for entry in registry.stats() if entry["loaded"]} == {"json"}
@@ -0,0 +1,141 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+import requests
+from fastapi import HTTPException
+
+import main
+import worker
+from conftest import PROJECT_DIR
+from job_store import JobStore, JOB_STATUS_RUNNING, JOB_STATUS_SUCCEEDED, JOB_STATUS_FAILED
+
+def test_several_worker_processes_drain_shared_queue(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    store = JobStore(db_path)
+    job_ids = []
+    for i in range(12):
+        job, _ = store.create_job("generate-sfx", {"category": "Test Category", "description": f"queued sound {i}"})
+        job_ids.append(job["id"])
+
+    env = {**os.environ, "PIPELINE_JOB_DB": db_path, "PIPELINE_PROJECT_ROOT": str(tmp_path)}
+    worker_ids = [f"test-worker-{n}" for n in range(3)]
+    workers = [
+        subprocess.Popen(
+            [sys.executable, os.path.join(PROJECT_DIR, "backend", "worker.py"), "--worker-id", worker_id, "--exit-when-idle", "--poll-interval", "0.05"],
+            env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+        )
+        for worker_id in worker_ids
+    ]
+    for worker in workers:
+        output, _ = worker.communicate(timeout=60)
+        assert worker.returncode == 0, output
+
+    artifact_paths = []
+    for job_id in job_ids:
+        job = store.get_job(job_id)
+        assert job["status"] == JOB_STATUS_SUCCEEDED, job
+        assert job["attempts"] == 1 # Claimed exactly once
+        assert job["worker_id"] in worker_ids
+        assert job["result"]["job_id"] == job_id
+        assert all(f"/{job_id}/1/" in path for path in job["artifact_paths"]) # Written under the attempt that recorded it
+        artifact_paths.extend(job["artifact_paths"])
+        assert all(os.path.isfile(tmp_path / path) for path in job["artifact_paths"])
+    # Every job wrote its own file instead of overwriting a shared placeholder.
+    assert len(set(artifact_paths)) == len(job_ids)
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def test_remote_worker_completes_jobs_through_api(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    store = JobStore(db_path)
+    job, _ = store.create_job("generate-sfx", {"category": "Test Category", "description": "remote sound"})
+
+    env = {**os.environ, "PIPELINE_JOB_DB": db_path, "PIPELINE_PROJECT_ROOT": str(tmp_path), "PIPELINE_EXECUTION_MODE": "queue"}
+    api_url = f"http://127.0.0.1:{free_port()}"
+    api = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", os.path.join(PROJECT_DIR, "backend"), "--port", api_url.rsplit(":", 1)[1]],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                requests.get(f"{api_url}/health", timeout=1)
+                break
+            except requests.exceptions.ConnectionError:
+                assert time.monotonic() < deadline, "API did not start"
+                time.sleep(0.1)
+        # Point the worker at another database file: it must complete the job through the API without opening it.
+        unused_db_path = tmp_path / "unused" / "jobs.db"
+        worker_env = {**env, "PIPELINE_JOB_DB": str(unused_db_path)}
+        worker = subprocess.run(
+            [sys.executable, os.path.join(PROJECT_DIR, "backend", "worker.py"), "--worker-id", "remote-worker", "--api-url", api_url, "--exit-when-idle"],
+            env=worker_env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, timeout=60,
+        )
+        assert worker.returncode == 0, worker.stdout
+    finally:
+        api.terminate()
+        api.wait(timeout=10)
+
+    job = store.get_job(job["id"])
+    assert job["status"] == JOB_STATUS_SUCCEEDED, job
+    assert job["worker_id"] == "remote-worker"
+    assert job["result"]["job_id"] == job["id"]
+    assert os.path.isfile(tmp_path / job["artifact_paths"][0])
+    assert not unused_db_path.parent.exists()
+
+def test_job_that_lost_its_lease_does_not_return_its_result(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "PROJECT_ROOT_DIR", str(tmp_path))
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job, _ = store.create_job("generate-sfx", {"category": "Test Category", "description": "slow"}, worker_id="api-a", lease_seconds=0.01)
+    time.sleep(0.05)
+    assert store.claim_next_job("api-b", lease_seconds=30, max_attempts=3)["id"] == job["id"]
+
+    request_model = main.SFXRequest(category="Test Category", description="slow")
+    with pytest.raises(HTTPException) as error:
+        main.execute_job(job["id"], job["kind"], 1, request_model, "api-a", store=store)
+    assert error.value.status_code == 409
+    job = store.get_job(job["id"])
+    assert job["status"] == JOB_STATUS_RUNNING and job["worker_id"] == "api-b"
+
+def test_recovery_fails_jobs_with_invalid_payloads_and_keeps_going(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "PROJECT_ROOT_DIR", str(tmp_path))
+    store = JobStore(str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(main, "get_job_store", lambda: store)
+    invalid, _ = store.create_job("generate-sfx", {"category": "Test Category"}, worker_id="api-crashed", lease_seconds=0.01)
+    valid, _ = store.create_job("generate-sfx", {"category": "Test Category", "description": "resumed"}, worker_id="api-crashed", lease_seconds=0.01)
+    time.sleep(0.05)
+
+    main.resume_interrupted_jobs()
+    invalid = store.get_job(invalid["id"])
+    assert invalid["status"] == JOB_STATUS_FAILED and invalid["error_code"] == 422
+    assert store.get_job(valid["id"])["status"] == JOB_STATUS_SUCCEEDED
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.text = f"status {status_code}"
+
+def test_api_heartbeat_treats_only_conflict_as_lost_lease():
+    queue = worker.ApiJobQueue("http://api")
+    for status_code, still_owned in ((200, True), (503, True), (500, True), (409, False)):
+        queue._post = lambda path, payload: FakeResponse(status_code)
+        assert queue.heartbeat("job-1", "remote-worker", 30) is still_owned, status_code
+
+def test_worker_keeps_polling_while_api_is_unreachable(monkeypatch):
+    claim_results = [requests.exceptions.ConnectionError("API restarting"), requests.exceptions.ReadTimeout("slow"), None]
+    def claim_next_job(self, worker_id, lease_seconds, max_attempts, kinds=None):
+        result = claim_results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    monkeypatch.setattr(worker.ApiJobQueue, "claim_next_job", claim_next_job)
+    assert worker.run_worker("remote-worker", poll_interval=0, exit_when_idle=True, api_url="http://api") == 0
+    assert claim_results == []